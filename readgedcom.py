@@ -67,9 +67,10 @@ v2.0
 """
 
 import sys
-import copy
 import re
+import operator
 import datetime
+import functools
 from collections.abc import Iterable
 from collections import defaultdict
 
@@ -84,9 +85,18 @@ PARSED_SECTIONS = [PARSED_INDI, PARSED_FAM, PARSED_MESSAGES]
 # It may also be present in older versions (RootsMagic does include it).
 FILE_LEAD_CHAR = '\ufeff'
 
+# Large input files are read in big chunks rather than the default small blocks.
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Similarly the output files are written in big chunks.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 # The "x" becomes a "startwsith" comparison
 SUPPORTED_VERSIONS = [ '5.5.1', '5.5.5', '7.0.x' ]
 
+# ex: "7.0.x" becomes "7.0." to be matched by "7.0.3"
+SUPPORTED_VERSION_PREFIXES = tuple( v.split( 'x', 1 )[0] for v in SUPPORTED_VERSIONS if 'x' in v )
+
 # Section types, listed in order or at least header first and trailer last.
 # Some are not valid in GEDCOM 5.5.x, but that's ok if they are not found.
 # Including a RootsMagic specific: _evdef, _todo
@@ -100,6 +110,16 @@ SECT_TRLR = 'trlr'
 NON_STD_SECTIONS = ['_evdef', '_todo', '_plac_defn', '_event_defn']
 SECTION_NAMES = [SECT_HEAD, 'subm', SECT_INDI, SECT_FAM, SECT_PLAC, 'obje', 'repo', 'snote', 'sour'] + NON_STD_SECTIONS + [SECT_TRLR]
 
+# Sections detected by an xref followed by the section name, ex: "0 @s12@ sour"
+XREF_SECTION_NAMES = frozenset( ['obje', 'repo', 'sour', 'subm'] )
+
+# Every section created by read_file. Any other section of the data
+# structure is unknown and gets output as-is.
+KNOWN_SECTIONS = frozenset( SECTION_NAMES + PARSED_SECTIONS )
+
+# The sections in output order before the trailer, which always goes last.
+BODY_SECTION_NAMES = tuple( sect for sect in SECTION_NAMES if sect != SECT_TRLR )
+
 # From GEDCOM 7.0.1 spec pg 40
 FAM_EVENT_TAGS = ['anul','cens','div','divf','enga','marb','marc','marl','mars','marr','even']
 
@@ -141,6 +161,9 @@ ONCE_INDI_TAGS = ['exid', '_uid', 'uuid', '_uuid']
 # See the description of individuals only once.
 ONCE_FAM_TAGS = ['husb','wife']
 
+# The individual's family xref lists in which duplicates are removed.
+FAMILY_XREF_TAGS = tuple( prefix + tag for tag in ['famc','fams'] for prefix in ['','birth-','all-'] )
+
 # There are other important records, such as birth and death which are allowed
 # to occur more than once (research purposes).
 # A meta-structure will be added to each individual pointing to the "best" event,
@@ -162,9 +185,23 @@ LEVEL2_SUB_NAMES = ['npfx', 'nick', 'nsfx']
 # Name sub-parts in order of display appearance
 LEVEL2_NAMES = ['givn', 'surn'] + LEVEL2_SUB_NAMES
 
+# Made from the above for use on every name record:
+# the name tags to test against, and the parts which form the display name.
+LEVEL2_NAME_SET = frozenset( LEVEL2_NAMES )
+DISPLAY_NAME_PARTS = tuple( tag for tag in LEVEL2_NAMES if tag not in LEVEL2_SUB_NAMES )
+
+# Sets made from the above tag lists for the membership tests done on every
+# parsed record. The lists remain for the places where the order matters.
+INDI_EVENT_TAG_SET = frozenset( INDI_EVENT_TAGS )
+PARSED_INDI_TAG_SET = frozenset( ['name'] + OTHER_INDI_TAGS + INDI_EVENT_TAGS )
+FAM_EVENT_TAG_SET = frozenset( FAM_EVENT_TAGS )
+PARSED_FAM_TAG_SET = frozenset( OTHER_FAM_TAGS + FAM_EVENT_TAGS + FAM_MEMBER_TAGS )
+EVENT_TAG_SET = INDI_EVENT_TAG_SET | FAM_EVENT_TAG_SET
+
 # This code doesn't deal with calendars, but need to know what to look for
 # in case of words before a date.
 CALENDAR_NAMES = [ 'gregorian', 'hebrew', 'julian', 'french_r' ]
+CALENDAR_NAME_SET = frozenset( CALENDAR_NAMES )
 
 # From GEDCOM 7.0.3 spec pg 21
 DATE_MODIFIERS = [ 'abt', 'aft', 'bef', 'cal', 'est' ]
@@ -178,6 +215,17 @@ ALT_DATE_MODIFIERS = {'about':'abt', 'after':'aft', 'before':'bef',
                       'abt.':'abt', 'aft.':'aft', 'bef.':'bef',
                       'ca.':'abt', 'cal.':'cal', 'est.':'est' }
 
+# Both of the above in one lookup, each giving the spec modifier.
+DATE_MODIFIER_LOOKUP = dict( ALT_DATE_MODIFIERS )
+DATE_MODIFIER_LOOKUP.update( { modifier: modifier for modifier in DATE_MODIFIERS } )
+
+# Punctuation dropped from a month or year part of a malformed date.
+DATE_MISTAKE_CHARS = str.maketrans( '', '', '-.' )
+
+# The calendar and epoch words which are ignored in a date.
+GREGORIAN_PREFIX = re.compile( r'^gregorian' )
+BCE_SUFFIX = re.compile( r'bce$' )
+
 # The defacto-standard replacement for an unknown name
 UNKNOWN_NAME = '[-?-]'  #those are supposted to be en-dashes - will update later
 
@@ -190,6 +238,12 @@ MONTH_NUMBERS = {'jan':1, 'feb':2, 'mar':3, 'apr':4, 'may':5, 'jun':6,
 				'january':1, 'february':2, 'march':3, 'april':4, 'june':6,
 				'july':7, 'august':8, 'september':9, 'october':10, 'november':11, 'december':12}
 
+# Characters dropped from an xref to form an individual or family id
+XREF_REMOVE_CHARS = str.maketrans( '', '', '@ ' )
+
+# The same with the (ascii) uppercase letters lowered, all in one pass
+XREF_TO_ID = str.maketrans( 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz', '@ ' )
+
 # Bad dates can be attempted to be fixed or cause exit
 DATE_ERR = 'Malformed date:'
 
@@ -227,25 +281,34 @@ version = ''
 # This is the operational settings. Treat as a global
 run_settings = dict()
 
+# The constants don't change, so the self consistency checks
+# only need to pass once. Treat as a global.
+constants_checked = False
+
 # A place to save all messages which will be copied into the output data. Treat as a global.
 all_messages = []
 
 # This becomes a global into the convert routine
 unicode_table = dict()
 
+# Made from the above table: the single characters as a str.translate table
+# and the multi-character sequences which get replaced one by one.
+unicode_translation = dict()
+unicode_sequences = []
+
 
 def list_intersection( *lists ):
     """ For use with results of find_individuals.
         Return the intersection of all the given lists. """
-    result = set()
-    first_loop = True
-    for l in lists:
-        if isinstance( l, Iterable ):
-           if first_loop:
-              result = set( l )
-              first_loop = False
-           else:
-              result.intersection_update( set(l) )
+    # the set methods take any iterable, no need to convert each list
+    usable = [ l for l in lists if isinstance( l, Iterable ) ]
+    if not usable:
+       return []
+    result = set( usable[0] )
+    for l in usable[1:]:
+        if not result:
+           break
+        result.intersection_update( l )
     return list( result )
 
 
@@ -253,9 +316,7 @@ def list_difference( original, *subtract ):
     """ For use with results of find_individuals.
         Return the list "original" with other lists removed. """
     result = set( original )
-    for l in subtract:
-        if isinstance( l, Iterable ):
-           result.difference_update( set(l) )
+    result.difference_update( *[ l for l in subtract if isinstance( l, Iterable ) ] )
     return list( result )
 
 
@@ -263,9 +324,7 @@ def list_combine( *lists ):
     """ For use with results of find_individuals.
         Return as one list with no duplicates. """
     result = set()
-    for l in lists:
-        if isinstance( l, list ):
-           result.update( set(l) )
+    result.update( *[ l for l in lists if isinstance( l, list ) ] )
     return list( result )
 
 
@@ -327,23 +386,39 @@ def setup_unicode_table():
     return lookup_table
 
 
+# Names repeat a lot (given names, surnames, places) so the conversions are cached.
+# The unicode cache is cleared whenever its table is set up.
+CONVERSION_CACHE_SIZE = 65536
+
+
+@functools.lru_cache( maxsize=CONVERSION_CACHE_SIZE )
 def convert_to_unicode( s ):
     """ Convert common utf-8 encoded characters to unicode for the various display of names etc.
         The pythonic conversion routines don't seem to do the job.
     """
-    text = s.strip()
-    for item in unicode_table:
-        text = text.replace( unicode_table[item][0], unicode_table[item][1] )
-    return text
+    return translate_unicode( s.strip() )
 
 
+def translate_unicode( text ):
+    """ The conversion part of convert_to_unicode. """
+    # A sequence can start with a translated character, so the text is split
+    # around it and the parts converted separately.
+    for item in unicode_sequences:
+        if item[0] in text:
+           return item[1].join( [ translate_unicode( part ) for part in text.split( item[0] ) ] )
+    return text.translate( unicode_translation )
+
+
+HTML_TRANSLATION = str.maketrans( { '&':'&smp;', '<':'&lt;', '>':'&gt;',
+                                    '"':'&quot;', "'":'&apos;',
+                                    '`':'&#96;', '\\':'&bsol;' } )
+
+
+@functools.lru_cache( maxsize=CONVERSION_CACHE_SIZE )
 def convert_to_html( s ):
     """ Convert common utf-8 encoded characters to html for the various display of names etc."""
     # https://dev.w3.org/html5/html-author/charref
-    text = s.strip()
-    text = text.replace('&','&smp;').replace('<','&lt;').replace('>','&gt;' )
-    text = text.replace('"','&quot;').replace("'",'&apos;')
-    text = text.replace('`','&#96;').replace('\\','&bsol;')
+    text = s.strip().translate( HTML_TRANSLATION )
     # encode generates a byte array, decode goes back to a string
     text = text.encode( 'ascii', 'xmlcharrefreplace' ).decode( 'ascii' )
     return text
@@ -359,37 +434,34 @@ def print_warn( message ):
 def concat_things( *args ):
     """ Behave kinda like a print statement: convert all the things to strings.
         Return the large concatinated string. """
-    result = ''
-    space = ''
-    for arg in args:
-        result += space + str(arg).strip()
-        space = ' '
-    return result
+    return ' '.join( [ str(arg).strip() for arg in args ] )
+
+
+# Used for any setting not given to read_file. Not to be modified.
+DEFAULT_SETTINGS = { 'show-settings': False,
+                     'display-gedcom-warnings': False,
+                     'exit-on-bad-date': False,
+                     'exit-on-unknown-section': False,
+                     'exit-on-no-individuals': True,
+                     'exit-on-no-families': False,
+                     'exit-on-missing-individuals': False,
+                     'exit-on-missing-families': False,
+                     'exit-if-loop': False,
+                     'only-birth': False,
+                     'extend-years': False }
 
 
 def setup_settings( settings=None ):
     """ Set the settings which control how the program operates.
         Return a dict with the defaults or the user supplied values. """
 
-    new_settings = dict()
+    defaults = DEFAULT_SETTINGS
 
-    if settings is None:
-       settings = dict()
-    if not isinstance( settings, dict ):
-       settings = dict()
-
-    defaults = dict()
-    defaults['show-settings'] = False
-    defaults['display-gedcom-warnings'] = False
-    defaults['exit-on-bad-date'] = False
-    defaults['exit-on-unknown-section'] = False
-    defaults['exit-on-no-individuals'] = True
-    defaults['exit-on-no-families'] = False
-    defaults['exit-on-missing-individuals'] = False
-    defaults['exit-on-missing-families'] = False
-    defaults['exit-if-loop'] = False
-    defaults['only-birth'] = False
-    defaults['extend-years'] = False
+    if not settings or not isinstance( settings, dict ):
+       # nothing to check, and the defaults don't show the settings
+       return dict( defaults )
+
+    new_settings = dict()
 
     for item in defaults:
         setting = defaults[item]
@@ -421,27 +493,31 @@ def setup_settings( settings=None ):
 
 def string_like_int( s ):
     """ Given a string, return true if it contains only digits. """
-    if re.search( r'\D', s ):
-       return False
-    return True
+    # isdecimal matches the same digits as the regex class \d,
+    # and as before an empty string has no non-digits.
+    return not s or s.isdecimal()
+
+
+def collapse_spaces( s ):
+    """ Return the string with runs of whitespace reduced to single spaces and no outer spaces. """
+    return ' '.join( s.split() )
 
 
 def yyyymmdd_to_date( yyyymmdd ):
                      #01234567
     """ Return the human form of dd mmm yyyy. """
-    y = yyyymmdd[:4]
-    m = yyyymmdd[4:6]
-    d = yyyymmdd[6:]
-
-    return d + ' ' + MONTH_NAMES[int(m)] + ' ' + y
+    return f'{yyyymmdd[6:]} {MONTH_NAMES[int(yyyymmdd[4:6])]} {yyyymmdd[:4]}'
 
 
 def comparable_before_today( years_ago ):
     """ Given a number of years before now, return yyyymmdd as that date."""
-    # The leap year approximation is ok, this isn't for exact comparisons.
-    leap_days = years_ago % 4
-    old_date = datetime.datetime.now() - datetime.timedelta( days = (365 * years_ago) + leap_days )
-    return '%4d%02d%02d' % ( old_date.year, old_date.month, old_date.day )
+    # The same month and day in the earlier year, no day counting needed.
+    # Feb 29 might not exist back then, the day before is close enough.
+    today = datetime.date.today()
+    day = today.day
+    if today.month == 2 and day == 29:
+       day = 28
+    return f'{today.year - years_ago:4d}{today.month:02d}{day:02d}'
 
 
 def strip_lead_chars( line ):
@@ -451,8 +527,8 @@ def strip_lead_chars( line ):
 
 def month_name_to_number( month_name ):
     """ Using the dict of month names, return the int month number, else zero if not found."""
-    if month_name and month_name.lower() in MONTH_NUMBERS:
-       return MONTH_NUMBERS[month_name.lower()]
+    if month_name:
+       return MONTH_NUMBERS.get( month_name.lower(), 0 )
     return 0
 
 
@@ -473,6 +549,10 @@ def detect_loops( data, print_report=True ):
     i_key = PARSED_INDI
     f_key = PARSED_FAM
 
+    # the sections are looked into many times
+    indis = data[i_key]
+    fams = data[f_key]
+
     def get_info( indi ):
         info = get_indi_display( data[i_key][indi] )
         out = str(data[i_key][indi]['xref']) + '/ '
@@ -494,67 +574,118 @@ def detect_loops( data, print_report=True ):
     def check_partners():
         result = False
         tag = 'fams'
-        for indi in data[i_key]:
-            if tag in data[i_key][indi]:
-               for fam in data[i_key][indi][tag]:
-                   partners = []
-                   for partner in ['wife','husb']:
-                       if partner in data[f_key][fam]:
-                          partners.append( data[f_key][fam][partner][0] )
-                   if len( partners ) == 2 and partners[0] == partners[1]:
-                       result = True
-                       show_fam( indi, fam, 'Double partners' )
+        for indi, indi_rec in indis.items():
+            for fam in indi_rec.get( tag, [] ):
+                fam_rec = fams[fam]
+                partners = []
+                for partner in ('wife','husb'):
+                    partner_list = fam_rec.get( partner )
+                    if partner_list:
+                       partners.append( partner_list[0] )
+                if len( partners ) == 2 and partners[0] == partners[1]:
+                   result = True
+                   show_fam( indi, fam, 'Double partners' )
         return result
 
     def check_siblings():
         result = False
         tag = 'famc'
-        for indi in data[i_key]:
-            if tag in data[i_key][indi]:
-               for fam in data[i_key][indi][tag]:
-                   count = 0
-                   for child in data[f_key][fam]['chil']:
-                       if child == indi:
-                          count += 1
-                   if count > 1:
-                      result = True
-                      show_fam( indi, fam, 'Double child' )
+        for indi, indi_rec in indis.items():
+            for fam in indi_rec.get( tag, [] ):
+                if fams[fam]['chil'].count( indi ) > 1:
+                   result = True
+                   show_fam( indi, fam, 'Double child' )
         return result
 
-    def check_self_ancestor( start_indi, fam, path, all_loopers ):
+    def check_self_ancestor( start_indi, fam, path, all_loopers, all_clear ):
         result = False
 
-        for partner_type in ['wife','husb']:
-            if partner_type in data[f_key][fam]:
-               partner = data[f_key][fam][partner_type][0]
-               # skip if already confirmed
-               if partner not in all_loopers:
+        fam_rec = fams[fam]
+        for partner_type in ('wife','husb'):
+            partner_list = fam_rec.get( partner_type )
+            if partner_list:
+               partner = partner_list[0]
+               # skip if already confirmed, either way
+               if partner not in all_loopers and partner not in all_clear:
                   if partner in path:
                      # have we come back to the beginning
                      if partner == start_indi:
                         # and don't try to look back to more ancestors
                         result = True
                         show_path( path )
-                        all_loopers.extend( path )
+                        all_loopers.update( path )
                   else:
-                     if 'famc' in data[i_key][partner]:
-                        for parent_fam in data[i_key][partner]['famc']:
-                            if check_self_ancestor( start_indi, parent_fam, path + [partner], all_loopers ):
-                               result = True
+                     for parent_fam in indis[partner].get( 'famc', [] ):
+                         if check_self_ancestor( start_indi, parent_fam, path + [partner], all_loopers, all_clear ):
+                            result = True
 
         return result
 
+    def has_graph_cycle():
+        # Treat people and families as the nodes of an undirected graph with
+        # an edge from each family to its first partners and to each child
+        # listing it as a parent family. Someone can only be their own ancestor
+        # if that graph has a cycle, which a union-find pass detects in linear time.
+        # Cousin marriages also make a cycle, so this only rules out the
+        # slower path checks for the (many) files without one.
+        roots = dict()
+
+        def find_root( node ):
+            root = node
+            while roots.get( root, root ) != root:
+                root = roots[root]
+            # compress the path for the next search
+            while node != root:
+                next_node = roots[node]
+                roots[node] = root
+                node = next_node
+            return root
+
+        def join( node1, node2 ):
+            # true if the two were already connected
+            root1 = find_root( node1 )
+            root2 = find_root( node2 )
+            if root1 == root2:
+               return True
+            roots[root1] = root2
+            return False
+
+        # the family ids are wrapped so they can't match a person id
+        for indi, indi_rec in indis.items():
+            for fam in indi_rec.get( 'famc', [] ):
+                if join( indi, (f_key,fam) ):
+                   return True
+
+        for fam, fam_rec in fams.items():
+            for partner_type in ('wife','husb'):
+                partners = fam_rec.get( partner_type )
+                if partners:
+                   if join( partners[0], (f_key,fam) ):
+                      return True
+
+        return False
+
     def check_ancestors():
         result = False
 
-        people_in_a_loop = []
+        # sets, since they are only used for membership tests
+        people_in_a_loop = set()
 
-        for indi in data[i_key]:
+        # A person whose own search found no way back to them can't be in
+        # any loop found later, so later searches don't need to pass through
+        # them. The people in a loop only grow, which only removes paths.
+        people_not_in_a_loop = set()
+
+        for indi, indi_rec in indis.items():
             if indi not in people_in_a_loop:
-               if 'famc' in data[i_key][indi]:
-                  for fam in data[i_key][indi]['famc']:
-                      if check_self_ancestor( indi, fam, [indi], people_in_a_loop ):
-                         result = True
+               found = False
+               for fam in indi_rec.get( 'famc', [] ):
+                   if check_self_ancestor( indi, fam, [indi], people_in_a_loop, people_not_in_a_loop ):
+                      found = True
+               if found:
+                  result = True
+               else:
+                  people_not_in_a_loop.add( indi )
 
         return result
 
@@ -566,8 +697,9 @@ def detect_loops( data, print_report=True ):
     if check_siblings():
        result = True
 
-    if check_ancestors():
-       result = True
+    if has_graph_cycle():
+       if check_ancestors():
+          result = True
 
     return result
 
@@ -578,34 +710,54 @@ def add_file_back_ref( file_tag, file_index, parsed_section ):
     parsed_section['file_record'] = { 'key':file_tag, 'index':file_index }
 
 
+def copy_level( level ):
+    """ Return a copy of a single record and its sub-records.
+        The strings are immutable so they are shared rather than copied."""
+    new_level = dict( level )
+    if 'parsed' in level:
+       new_level['parsed'] = dict( level['parsed'] )
+    # most records are leaves, skip the comprehension for those
+    if level['sub']:
+       new_level['sub'] = [ copy_level( sub_level ) for sub_level in level['sub'] ]
+    else:
+       new_level['sub'] = []
+    return new_level
+
+
 def copy_section( from_sect, to_sect, data ):
     """ Copy a portion of the data from one section to another."""
     if from_sect in SECTION_NAMES:
        if from_sect in data:
-          data[to_sect] = copy.deepcopy( data[from_sect] )
+          data[to_sect] = [ copy_level( level ) for level in data[from_sect] ]
        else:
           data[to_sect] = []
     else:
        print_warn( concat_things( 'Cant copy unknown section:', from_sect ) )
 
 
-def extract_indi_id( tag ):
+def extract_xref_id( tag ):
     """ Use the id as the xref which the spec. defines as "@" + xref + "@".
-        Rmove the @ and change to lowercase leaving the "i"
+        Rmove the @ and change to lowercase leaving the "i" or "f"
         Ex. from "@i123@" get "i123"."""
-    return tag.replace( '@', '' ).lower().replace( ' ', '' )
+    if tag.isascii():
+       return tag.translate( XREF_TO_ID )
+    return tag.translate( XREF_REMOVE_CHARS ).lower()
 
 
-def extract_fam_id( tag ):
-    """ Sumilar to extract_indi_id. """
-    return tag.replace( '@', '' ).lower().replace( ' ', '' )
+# The individual and family ids are extracted the same way.
+extract_indi_id = extract_xref_id
+extract_fam_id = extract_xref_id
 
 
 def output_sub_section( level, outf ):
     """ Print a portion of the data to the output file handle."""
-    print( level['in'], file=outf )
-    for sub_level in level['sub']:
-        output_sub_section( sub_level, outf )
+    # Walk with a stack rather than recursion.
+    # The sub-records are pushed in reverse to come off in file order.
+    stack = [ level ]
+    while stack:
+        level = stack.pop()
+        outf.write( level['in'] + '\n' )
+        stack.extend( reversed( level['sub'] ) )
 
 
 def output_section( section, outf ):
@@ -630,15 +782,15 @@ def output_original( data, file ):
 
     global version
 
-    with open( file, 'w', encoding='utf-8' ) as outf:
+    with open( file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE ) as outf:
          if not version.startswith( '5' ):
-            print( FILE_LEAD_CHAR, end='' )
-         for sect in SECTION_NAMES:
-             if sect in data and sect != SECT_TRLR:
+            outf.write( FILE_LEAD_CHAR )
+         for sect in BODY_SECTION_NAMES:
+             if sect in data:
                 output_section( data[sect], outf )
          # unknown sections
          for sect in data:
-             if sect not in SECTION_NAMES + PARSED_SECTIONS:
+             if sect not in KNOWN_SECTIONS:
                 output_section( data[sect], outf )
          # finally the trailer
          output_section( data[SECT_TRLR], outf )
@@ -661,16 +813,6 @@ def output_reordered( data, person_to_reorder, file ):
 
     global version
 
-    def output_individual_sub( person_section ):
-        if 'sub' in person_section:
-           for sub_section in person_section['sub']:
-               print( sub_section['in'], file=outf )
-               output_individual_sub( sub_section )
-
-    def output_individual( person_data ):
-        print( person_data['in'], file=outf )
-        output_individual_sub( person_data )
-
     # if not found, complain but continue
     do_reorder = True
     file_index = None
@@ -687,21 +829,21 @@ def output_reordered( data, person_to_reorder, file ):
           do_reorder = False
           print( 'Selected individual to reorder is not found', file=sys.stderr )
 
-    with open( file, 'w', encoding='utf-8' ) as outf:
+    with open( file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE ) as outf:
          if not version.startswith( '5' ):
-            print( FILE_LEAD_CHAR, end='' )
-         for sect in SECTION_NAMES:
-             if sect in data and sect != SECT_TRLR:
+            outf.write( FILE_LEAD_CHAR )
+         for sect in BODY_SECTION_NAMES:
+             if sect in data:
                 if sect == SECT_INDI and do_reorder:
-                   output_individual( data[SECT_INDI][file_index] )
+                   output_sub_section( data[SECT_INDI][file_index], outf )
                    for indi, indi_section in enumerate( data[SECT_INDI] ):
                        if indi != file_index:
-                          output_individual( indi_section )
+                          output_sub_section( indi_section, outf )
                 else:
                    output_section( data[sect], outf )
          # the ones which have been known
          for sect in data:
-             if sect not in SECTION_NAMES + PARSED_SECTIONS:
+             if sect not in KNOWN_SECTIONS:
                 output_section( data[sect], outf )
          # finally the trailer
          output_section( data[SECT_TRLR], outf )
@@ -714,10 +856,14 @@ def get_parsed_year( data ):
     value = ''
 
     if data['is_known']:
-       modifier = data['min']['modifier'].upper()
+       min_data = data['min']
+       modifier = min_data['modifier']
+       if not modifier and not data['is_range']:
+          # the most common case, a plain date
+          return str( min_data['year'] )
        if modifier:
-          value = modifier + ' '
-       value += str( data['min']['year'] )
+          value = modifier.upper() + ' '
+       value += str( min_data['year'] )
        if data['is_range']:
           value += ' '
           modifier = data['max']['modifier'].upper()
@@ -738,11 +884,9 @@ def get_reduced_date( lookup, parsed_data ):
 
     value = ''
 
-    k = lookup['key']
-    i = lookup['index']
-
-    if 'date' in parsed_data[k][i]:
-       value = get_parsed_year( parsed_data[k][i]['date'] )
+    date = parsed_data[lookup['key']][lookup['index']].get( 'date' )
+    if date:
+       value = get_parsed_year( date )
 
     return value
 
@@ -751,7 +895,7 @@ def output_section_no_dates( section, outf ):
     """ Print a section of the data to the file handle, skipping any date sub-sections."""
     for level in section:
         if level['tag'] != 'date':
-           print( level['in'], file=outf )
+           outf.write( level['in'] + '\n' )
            output_section_no_dates( level['sub'], outf )
 
 
@@ -761,34 +905,38 @@ def output_privatized_section( level0, priv_setting, event_list, parsed_data, ou
         'parsed_data' section for an individual or family.
         'event_list' contains the names of events which are likely to contain dates."""
 
-    print( level0['in'], file=outf )
+    # The tags were already lowercased when the lines were read,
+    # the input line only needs to be split when part of it is output.
+
+    full_privatize = priv_setting == PRIVATIZE_MAX
+
+    outf.write( level0['in'] + '\n' )
     for level1 in level0['sub']:
-        parts = level1['in'].split( ' ', 2 )
-        tag1 = parts[1].lower()
+        tag1 = level1['tag']
         if tag1 in event_list:
-           if priv_setting == PRIVATIZE_MAX:
+           if full_privatize:
               if tag1 == 'even':
                  # This custom event is output differently than the regular events
                  # such as birt, deat, etc.
-                 print( level1['in'], file=outf )
+                 outf.write( level1['in'] + '\n' )
                  # continue, but no dates
                  output_section_no_dates( level1['sub'], outf )
               else:
                  # For full privatization this event and subsection is skipped
                  # except it must be shown that the event is flagged as existing
-                 print( parts[0], parts[1], 'Y', file=outf )
+                 parts = level1['in'].split( ' ', 2 )
+                 outf.write( parts[0] + ' ' + parts[1] + ' Y\n' )
 
            else:
               # otherwise, partial privatization, reduce the detail in the dates
-              print( level1['in'], file=outf )
+              outf.write( level1['in'] + '\n' )
               for level2 in level1['sub']:
-                  parts = level2['in'].split( ' ', 2 )
-                  tag2 = parts[1].lower()
-                  if tag2 == 'date':
+                  if level2['tag'] == 'date':
                      # use the partly hidden date
-                     print( parts[0], parts[1], get_reduced_date( level1['parsed'], parsed_data), file=outf )
+                     parts = level2['in'].split( ' ', 2 )
+                     outf.write( parts[0] + ' ' + parts[1] + ' ' + get_reduced_date( level1['parsed'], parsed_data ) + '\n' )
                   else:
-                     print( level2['in'], file=outf )
+                     outf.write( level2['in'] + '\n' )
                   # continue with the rest
                   output_section( level2['sub'], outf )
 
@@ -799,12 +947,12 @@ def output_privatized_section( level0, priv_setting, event_list, parsed_data, ou
 
 def output_privatized_indi( level0, priv_setting, data_section, outf ):
     """ Print an individual to the output handle, in privatized format."""
-    output_privatized_section( level0, priv_setting, INDI_EVENT_TAGS, data_section, outf )
+    output_privatized_section( level0, priv_setting, INDI_EVENT_TAG_SET, data_section, outf )
 
 
 def output_privatized_fam( level0, priv_setting, data_section, outf ):
     """ Print a family to the output handle, in privatized format."""
-    output_privatized_section( level0, priv_setting, FAM_EVENT_TAGS, data_section, outf )
+    output_privatized_section( level0, priv_setting, FAM_EVENT_TAG_SET, data_section, outf )
 
 
 def check_section_priv( item, data ):
@@ -822,6 +970,26 @@ def check_indi_priv( indi, data ):
     return check_section_priv( extract_indi_id( indi ), data[PARSED_INDI] )
 
 
+def parsed_ids_by_index( section, parsed_data ):
+    """ Return lists of the parsed ids and of their privatization flags in the same
+        order as the records of the input file section, using the back reference
+        from each parsed record.
+        A record not referenced by the parsed data (a re-used id) gets None in both."""
+    ids = [None] * len( section )
+    flags = [None] * len( section )
+    for item, record in parsed_data.items():
+        index = record['file_record']['index']
+        ids[index] = item
+        flags[index] = record[PRIVATIZE_FLAG]
+    return ids, flags
+
+
+# The file sections which output_privatized reduces, with their parsed
+# section and the output function for a single record.
+PRIVATIZED_SECTIONS = { SECT_INDI: (PARSED_INDI, output_privatized_indi),
+                        SECT_FAM: (PARSED_FAM, output_privatized_fam) }
+
+
 def output_privatized( data, file ):
     """"
     Print the data to the given file name. Some data will not be output.
@@ -842,39 +1010,31 @@ def output_privatized( data, file ):
     # some will be dropped and some dates will be modified
     # based on the privatize setting for each person and family.
 
-    isect = PARSED_INDI
-    fsect = PARSED_FAM
-
-    with open( file, 'w', encoding='utf-8' ) as outf:
+    with open( file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE ) as outf:
          if not version.startswith( '5' ):
-            print( FILE_LEAD_CHAR, end='' )
-
-         for sect in SECTION_NAMES:
-             if sect in data and sect != SECT_TRLR:
-                if sect == SECT_INDI:
-                   for section in data[sect]:
-                       indi = extract_indi_id( section['tag'] )
-                       priv_setting = check_indi_priv( indi, data )
-                       if priv_setting == PRIVATIZE_OFF:
-                          output_sub_section( section, outf )
-                       else:
-                          output_privatized_indi( section, priv_setting, data[isect][indi], outf )
-
-                elif sect == SECT_FAM:
-                   for section in data[sect]:
-                       fam = extract_fam_id( section['tag'] )
-                       priv_setting = check_fam_priv( fam, data )
+            outf.write( FILE_LEAD_CHAR )
+
+         for sect in BODY_SECTION_NAMES:
+             if sect in data:
+                if sect in PRIVATIZED_SECTIONS:
+                   psect, output_privatized_record = PRIVATIZED_SECTIONS[sect]
+                   parsed_data = data[psect]
+                   ids, flags = parsed_ids_by_index( data[sect], parsed_data )
+                   for section, item, priv_setting in zip( data[sect], ids, flags ):
+                       if item is None:
+                          item = extract_xref_id( section['tag'] )
+                          priv_setting = check_section_priv( item, parsed_data )
                        if priv_setting == PRIVATIZE_OFF:
                           output_sub_section( section, outf )
                        else:
-                          output_privatized_fam( section, priv_setting, data[fsect][fam], outf )
+                          output_privatized_record( section, priv_setting, parsed_data[item], outf )
 
                 else:
                    output_section( data[sect], outf )
 
          # unknown sections
          for sect in data:
-             if sect not in SECTION_NAMES + PARSED_SECTIONS:
+             if sect not in KNOWN_SECTIONS:
                 output_section( data[sect], outf )
          # finally the trailer
          output_section( data[SECT_TRLR], outf )
@@ -900,18 +1060,7 @@ def confirm_gedcom_version( data ):
                      break
 
        if version:
-          ok = False
-          for supported in SUPPORTED_VERSIONS:
-              if 'x' in supported:
-                 # ex: change "7.0.x" to "7.0." and see if that matches "7.0.3"
-                 with_wildcard = re.sub( r'x.*', '', supported )
-                 if version.startswith( with_wildcard ):
-                    ok = True
-                    break
-              else:
-                 if version == supported:
-                    ok = True
-                    break
+          ok = version in SUPPORTED_VERSIONS or version.startswith( SUPPORTED_VERSION_PREFIXES )
           if not ok:
              raise ValueError( 'Version not supported:' + str(version) )
        else:
@@ -948,19 +1097,18 @@ def line_values( input_line ):
     # becomes
     # { in:'2 DATE 14 DEC 1895', tag:'date', value:'14 DEC 1895', sub:[] }
 
-    data = dict()
+    # The record stays a plain dict because its layout is part of the documented
+    # data structure, but it is built in a single step rather than key by key.
+    #
+    # The same few tags occur on most lines; interning them shares one string
+    # per tag and lets dict lookups with the tag constants match by identity.
 
     parts = input_line.split(' ', 2)
 
-    data['in'] = input_line
-    data['tag'] = parts[1].lower()
-    value = None
-    if len(parts) > 2:
-       value = parts[2]
-    data['value'] = value
-    data['sub'] = []
-
-    return data
+    return { 'in': input_line,
+             'tag': sys.intern( parts[1].lower() ),
+             'value': parts[2] if len(parts) > 2 else None,
+             'sub': [] }
 
 
 def date_to_comparable( original ):
@@ -997,7 +1145,11 @@ def date_to_comparable( original ):
     default_month = 1
     default_year = 1
 
+    # module values used for every date, fetched once
     exit_bad_date = run_settings['exit-on-bad-date']
+    get_month = MONTH_NUMBERS.get
+    min_year = min_valid_year
+    max_year = max_valid_year
 
     result = None
     malformed = False
@@ -1005,15 +1157,15 @@ def date_to_comparable( original ):
     month_form = ''
     day_form = ''
 
-    date = original.lower().replace( '  ', ' ' ).replace( '  ', ' ' ).strip()
-    date = re.sub( r'^gregorian', '', date ).strip() #ignore this calendar
-    date = re.sub( r'bce$', '', date ).strip() #ignore this epoch
+    date = collapse_spaces( original.lower() )
+    date = GREGORIAN_PREFIX.sub( '', date ).strip() #ignore this calendar
+    date = BCE_SUFFIX.sub( '', date ).strip() #ignore this epoch
 
     if date:
 
        parts = date.split()
 
-       if parts[0] in CALENDAR_NAMES:
+       if parts[0] in CALENDAR_NAME_SET:
           raise ValueError( 'Cannot handle calendar: ' + str(parts[0]) )
 
        day = default_day
@@ -1041,7 +1193,9 @@ def date_to_comparable( original ):
        if isinstance(day,str):
           # i.e. has been extracted from the given date string
           # Note: not checking for number of days in month
-          if string_like_int( day ):
+          # The parts come from split so are never empty, which makes
+          # isdecimal the same test as string_like_int without the call.
+          if day.isdecimal():
              day = int( day )
              if 1 <= day <= 31:
                 day_form = 'dd'
@@ -1061,15 +1215,17 @@ def date_to_comparable( original ):
 
        if isinstance(month,str):
           #i.e. has been extracted from the given date string
-          if month in MONTH_NUMBERS:
-             month = month_name_to_number( month )
+          # already lowercase, so look up the number directly
+          month_number = get_month( month )
+          if month_number:
+             month = month_number
              month_form = 'mm'
           else:
              malformed = True
              print( DATE_ERR, original, ': attempting to correct', file=sys.stderr )
-             month = month.replace( '-', '' ).replace( '.', '' )
-             if month in MONTH_NUMBERS:
-                month = month_name_to_number( month )
+             month_number = get_month( month.translate( DATE_MISTAKE_CHARS ) )
+             if month_number:
+                month = month_number
                 month_form = 'mm'
              else:
                 if exit_bad_date:
@@ -1080,9 +1236,9 @@ def date_to_comparable( original ):
        if isinstance(year,str):
           #i.e. has been extracted from the given date string
           # also check for a reasonable range
-          if string_like_int( year ):
+          if year.isdecimal():
              year = int( year )
-             if min_valid_year <= year <= max_valid_year:
+             if min_year <= year <= max_year:
                 year_form = 'yyyy'
              else:
                 malformed = True
@@ -1095,10 +1251,10 @@ def date_to_comparable( original ):
              # don't throw an exception yet
              print_warn( concat_things( DATE_ERR, original, ':attempting to correct' ) )
              # Ancestry mistakes
-             year = year.replace( '-', '' ).replace( '.', '' )
+             year = year.translate( DATE_MISTAKE_CHARS )
              if string_like_int( year ):
                 year = int( year )
-                if min_valid_year <= year <= max_valid_year:
+                if min_year <= year <= max_year:
                    year_form = 'yyyy'
                 else:
                    if exit_bad_date:
@@ -1112,7 +1268,7 @@ def date_to_comparable( original ):
                 year = default_year
                 print_warn( concat_things( DATE_ERR, original, ':setting year to:', year ) )
 
-       result = '%04d%02d%02d' % ( year, month, day )
+       result = f'{year:04d}{month:02d}{day:02d}'
 
     date_form = ''
     if year_form:
@@ -1159,31 +1315,27 @@ def date_to_structure( original ):
     If is_known is False, it is the only item in the returned dict.
     """
 
-    copy_date_items = ['value','modifier','form']
-
     value = dict()
     value['is_known'] = False
     given = None
 
     if original:
-       given = original.lower().replace( '  ', ' ' ).replace( '  ', ' ' ).strip()
+       given = collapse_spaces( original.lower() )
 
     if given:
+       # the max portion of a non-range date is filled in at the end
        value['is_known'] = True
-
        value['is_range'] = False
        value['in'] = original
        value['malformed'] = False
-       value['min'] = dict()
-       value['max'] = dict()
-       value['min']['modifier'] = ''
-       value['max']['modifier'] = ''
+       value['min'] = { 'modifier': '' }
 
        # Ranges cannot contain modifiers such as before, after, etc.,
        # use the "from" / "to", etc. instead
 
        if 'from ' in given and ' to ' in given:
           value['is_range'] = True
+          value['max'] = { 'modifier': '' }
           parts = given.replace( 'from ', '' ).split( ' to ' )
           date_comparable_results( parts[0], 'min', value )
           date_comparable_results( parts[1], 'max', value )
@@ -1192,6 +1344,7 @@ def date_to_structure( original ):
 
        elif 'bet ' in given and ' and ' in given:
           value['is_range'] = True
+          value['max'] = { 'modifier': '' }
           parts = given.replace( 'bet ', '' ).split( ' and ' )
           date_comparable_results( parts[0], 'min', value )
           date_comparable_results( parts[1], 'max', value )
@@ -1203,25 +1356,23 @@ def date_to_structure( original ):
           # why use this instead of 'before'
           date_comparable_results( given.replace( 'to ', '' ), 'min', value )
           value['min']['modifier'] = 'to'
-          for item in copy_date_items:
-              value['max'][item] = value['min'][item]
 
        else:
           parts = given.split()
 
-          if parts[0] in DATE_MODIFIERS:
-             value['min']['modifier'] = parts[0]
-             given = given.replace( parts[0] + ' ', '' )
-          elif parts[0] in ALT_DATE_MODIFIERS:
-             value['min']['modifier'] = ALT_DATE_MODIFIERS[parts[0]]
+          modifier = DATE_MODIFIER_LOOKUP.get( parts[0] )
+          if modifier:
+             value['min']['modifier'] = modifier
              given = given.replace( parts[0] + ' ', '' )
 
           date_comparable_results( given, 'min', value )
 
-          for item in copy_date_items:
-              value['max'][item] = value['min'][item]
-
        for item in ['min','max']:
+           if item not in value:
+              # not a range, the max is the same as the min
+              value[item] = dict( value['min'] )
+              continue
+
            # no value will mean that the "year" and "sortable" items will not exist
            yyyymmdd = value[item]['value']
            if yyyymmdd:
@@ -1272,18 +1423,13 @@ def get_note( level2 ):
     #
     # GEDCOM 7.0.1 introduces the "cont" tag which might require newlines between records.
 
-    value = ''
-    if level2['value']:
-       value += level2['value']
+    # collected then joined, a long note can have many continuation lines
+    parts = [ level2['value'] or '' ]
     for level3 in level2['sub']:
-        tag = level3['tag']
-        if tag in ['conc','cont']:
-           if level3['value']:
-              value += level3['value']
-           else:
-              value += ' '
+        if level3['tag'] in ('conc','cont'):
+           parts.append( level3['value'] or ' ' )
 
-    return value.replace( '  ', ' ' )
+    return ''.join( parts ).replace( '  ', ' ' )
 
 
 def set_best_events( single_time_list, out_data ):
@@ -1296,27 +1442,34 @@ def set_best_events( single_time_list, out_data ):
     # Note that custom event records with the tag "even" are not included
     # because of the the associated even.type
 
-    out_data[BEST_EVENT_KEY] = dict()
+    best_events = dict()
+    out_data[BEST_EVENT_KEY] = best_events
+
+    # module values used for every event, fetched once
+    proof_values = EVENT_PROOF_VALUES
+    proof_tag = EVENT_PROOF_TAG
+    primary_tag = EVENT_PRIMARY_TAG
+    default_value = proof_values[EVENT_PROOF_DEFAULT]
+    disproven_value = proof_values['disproven']
 
     # Initial value is smaller than the smallest of all in order for the first test
     # to pick up the first item tested.
-    smallest = min( EVENT_PROOF_VALUES.values() ) - 1
+    smallest = min( proof_values.values() ) - 1
 
     for tag in single_time_list:
-        if tag in out_data:
+        events = out_data.get( tag )
+        if events:
 
            # Find the best: disproven having lowest value, proven is highest
            value_best = smallest
            found_best = 0
 
-           for i, section in enumerate( out_data[tag] ):
-               value = EVENT_PROOF_VALUES[EVENT_PROOF_DEFAULT]
-               if EVENT_PROOF_TAG in section:
-                  proof_setting = section[EVENT_PROOF_TAG].lower()
-                  if proof_setting in EVENT_PROOF_VALUES:
-                     value = EVENT_PROOF_VALUES[proof_setting]
+           for i, section in enumerate( events ):
+               value = default_value
+               if proof_tag in section:
+                  value = proof_values.get( section[proof_tag].lower(), value )
                   # just the existance of this tag is good enough
-                  if EVENT_PRIMARY_TAG in section:
+                  if primary_tag in section:
                      # even better is primary, but disproven gets no better
                      value *= 10
                if value > value_best:
@@ -1324,8 +1477,8 @@ def set_best_events( single_time_list, out_data ):
                   found_best = i
 
            # must be better than disproven to get included in the list of best events
-           if value_best > EVENT_PROOF_VALUES['disproven']:
-              out_data[BEST_EVENT_KEY][tag] = found_best
+           if value_best > disproven_value:
+              best_events[tag] = found_best
 
 
 def handle_event_dates( value ):
@@ -1348,6 +1501,52 @@ def handle_address_details( addr_level, top_out_data ):
     return cont
 
 
+def event_sub_value( level2, values ):
+    """ Event sub-record handler: the value as-is. """
+    return level2['value']
+
+
+def event_sub_lower( level2, values ):
+    """ Event sub-record handler: the value in lowercase. """
+    return level2['value'].lower()
+
+
+def event_sub_date( level2, values ):
+    """ Event sub-record handler: the parsed date. """
+    return handle_event_dates( level2['value'] )
+
+
+def event_sub_note( level2, values ):
+    """ Event sub-record handler: the note with its continuation lines. """
+    return get_note( level2 )
+
+
+def event_sub_addr( level2, values ):
+    """ Event sub-record handler: the address with its continuation lines.
+        Address parts such as city and map are added to the event values."""
+    value = level2['value']
+    if level2['sub']:
+       value += handle_address_details( level2['sub'], values )
+    return value.replace( '  ', ' ' )
+
+
+# Handlers for the sub-records of an event, by tag. Others are not parsed.
+EVENT_SUB_HANDLERS = { 'plac': event_sub_value,
+                       EVENT_PRIMARY_TAG: event_sub_value,
+                       EVENT_PROOF_TAG: event_sub_value,
+                       'addr': event_sub_addr,
+                       'date': event_sub_date,
+                       'note': event_sub_note }
+
+# Custom events keep every sub-record, with the value as-is by default.
+CUSTOM_EVENT_SUB_HANDLERS = { 'type': event_sub_lower,
+                              EVENT_PRIMARY_TAG: event_sub_value,
+                              EVENT_PROOF_TAG: event_sub_value,
+                              'addr': event_sub_addr,
+                              'date': event_sub_date,
+                              'note': event_sub_note }
+
+
 def handle_event_tag( tag, level1, out_data ):
     """ Parse an individual or family event record."""
 
@@ -1387,20 +1586,9 @@ def handle_event_tag( tag, level1, out_data ):
 
     for level2 in level1['sub']:
         tag2 = level2['tag']
-        value = level2['value']
-
-        if tag2 in ['plac', EVENT_PRIMARY_TAG, EVENT_PROOF_TAG ]:
-           values[tag2] = value
-
-        elif tag2 == 'addr':
-           if level2['sub']:
-              value += handle_address_details( level2['sub'], values )
-           values[tag2] = value.replace( '  ', ' ' )
-
-        elif tag2 == 'date':
-           values[tag2] = handle_event_dates( value )
-        elif tag2 == 'note':
-           values[tag2] = get_note( level2 )
+        handler = EVENT_SUB_HANDLERS.get( tag2 )
+        if handler:
+           values[tag2] = handler( level2, values )
 
     if ancestry_note:
        if 'note' in values:
@@ -1413,10 +1601,8 @@ def handle_event_tag( tag, level1, out_data ):
     # then even  x['date'] won't exist, so it needs to be checked before
     # the check for x['date']['is_known']
     # For the cases where a date is expected - add the date/not known
-    if tag in INDI_EVENT_TAGS + FAM_EVENT_TAGS:
-       if 'date' not in values:
-          values['date'] = dict()
-          values['date']['is_known'] = False
+    if tag in EVENT_TAG_SET:
+       values.setdefault( 'date', {'is_known': False} )
 
     out_data[tag].append( values )
 
@@ -1446,21 +1632,8 @@ def handle_custom_event( tag, level1, out_data ):
 
     for level2 in level1['sub']:
         tag2 = level2['tag']
-        value = level2['value']
-        if tag2 == 'type':
-           values[tag2] = value.lower()
-        elif tag2 in [ EVENT_PRIMARY_TAG, EVENT_PROOF_TAG ]:
-           values[tag2] = value
-        elif tag2 == 'date':
-           values[tag2] = handle_event_dates( value )
-        elif tag2 == 'note':
-           values[tag2] = get_note( level2 )
-        elif tag2 == 'addr':
-           if level2['sub']:
-              value += handle_address_details( level2['sub'], values )
-           values[tag2] = value.replace( '  ', ' ' )
-        else:
-           values[tag2] = value
+        handler = CUSTOM_EVENT_SUB_HANDLERS.get( tag2, event_sub_value )
+        values[tag2] = handler( level2, values )
 
     out_data[tag].append( values )
 
@@ -1498,7 +1671,7 @@ def handle_name_tag( tag, level1, out_data ):
     for level2 in level1['sub']:
         tag2 = level2['tag']
         # also prevent null values here
-        if tag2 in LEVEL2_NAMES:
+        if tag2 in LEVEL2_NAME_SET:
            value = ''
            if level2['value']:
               value = level2['value']
@@ -1512,13 +1685,8 @@ def handle_name_tag( tag, level1, out_data ):
            names[tag2] = value
 
     # Form the display name from the parts (if exist) because they might look better
-    value = ''
     if have_surn_parts:
-       space = ''
-       for tag2 in LEVEL2_NAMES:
-           if tag2 in names and tag2 not in LEVEL2_SUB_NAMES:
-              value += space + names[tag2]
-              space = ' '
+       value = ' '.join( [ names[tag2] for tag2 in DISPLAY_NAME_PARTS if tag2 in names ] )
 
     else:
        # or from the saved name without the slashes
@@ -1538,36 +1706,57 @@ def ensure_not_twice( tag_list, sect_type, ref_id, data ):
               raise ValueError( concat_things( DATA_ERR, sect_type, ref_id, 'tag occured more than once:', tag ) )
 
 
-def parse_family( level0, out_data ):
-    """ Parse a family record from the input section to the parsed families section."""
+def handle_child_item( child, level1, out_data ):
+    """ Parse the relation of a child to each of the family parents. """
+
+    # special items such as RootsMagic non-biological tags
+    # 1 CHIL @I1@
+    # 2 _FREL adopted
+    # 2 _MREL adopted
+
+    # put it into this dict
+    rel_key = 'rel'
+
+    # convert tag name to match the parent
+    rel_parent = {'_mrel': 'wife', '_frel': 'husb'}
+
+    # producing a result like
+    # 'rel': {'child-id': {'wife':'adopted', 'husb':'adopted'}}
+    # a regular would be "birth"
+
+    for level2 in level1['sub']:
+        tag2 = level2['tag']
+        parent = rel_parent.get( tag2 )
+        if parent:
+           out_data.setdefault( rel_key, dict() ).setdefault( child, dict() )[parent] = level2['value'].lower()
 
-    def handle_child_item( child, level1 ):
-        # special items such as RootsMagic non-biological tags
-        # 1 CHIL @I1@
-        # 2 _FREL adopted
-        # 2 _MREL adopted
 
-        # put it into this dict
-        rel_key = 'rel'
+def fam_sub_member( tag, level1, out_data ):
+    """ Family record handler: a partner or child xref. """
+    indi_id = extract_indi_id( level1['value'] )
+    out_data[tag].append( indi_id )
 
-        # convert tag name to match the parent
-        rel_parent = {'_mrel': 'wife', '_frel': 'husb'}
+    if tag == 'chil':
+       handle_child_item( indi_id, level1, out_data )
 
-        # producing a result like
-        # 'rel': {'child-id': {'wife':'adopted', 'husb':'adopted'}}
-        # a regular would be "birth"
 
-        for level2 in level1['sub']:
-            tag2 = level2['tag']
-            if tag2 in rel_parent:
-               parent = rel_parent[tag2]
-               if rel_key not in out_data:
-                  out_data[rel_key] = dict()
-               if child not in out_data[rel_key]:
-                  out_data[rel_key][child] = dict()
-               out_data[rel_key][child][parent] = level2['value'].lower()
+def fam_sub_value( tag, level1, out_data ):
+    """ Family record handler: the value as-is. """
+    out_data[tag].append( level1['value'] )
 
 
+# Handlers for the level 1 records of a family, by tag. Others are not parsed.
+# Filled from the lowest precedence up because a few tags are in more than
+# one list, i.e. the custom events are also in the event list.
+FAM_HANDLERS = dict.fromkeys( FAM_EVENT_TAGS, handle_event_tag )
+FAM_HANDLERS.update( dict.fromkeys( ['even','fact'], handle_custom_event ) )
+FAM_HANDLERS.update( dict.fromkeys( OTHER_FAM_TAGS, fam_sub_value ) )
+FAM_HANDLERS.update( dict.fromkeys( FAM_MEMBER_TAGS, fam_sub_member ) )
+
+
+def parse_family( level0, out_data ):
+    """ Parse a family record from the input section to the parsed families section."""
+
     # Use this flag on output of modified data
     out_data[PRIVATIZE_FLAG] = PRIVATIZE_OFF
 
@@ -1576,35 +1765,18 @@ def parse_family( level0, out_data ):
 
     for level1 in level0['sub']:
         tag = level1['tag']
-        value = level1['value']
 
         # Not everything is copied into the parsed section.
         # Setup an empty list for those things which will be copied.
-        parsed = False
-        if tag in OTHER_FAM_TAGS + FAM_EVENT_TAGS + FAM_MEMBER_TAGS:
-           parsed = True
-           if tag not in out_data:
-              out_data[tag] = []
+        parsed = tag in PARSED_FAM_TAG_SET
+        if parsed:
+           out_data.setdefault( tag, [] )
 
         # Now deal with that record.
 
-        if tag in FAM_MEMBER_TAGS:
-           indi_id = extract_indi_id( value )
-           out_data[tag].append( indi_id )
-
-           if tag == 'chil':
-              handle_child_item( indi_id, level1 )
-
-        elif tag in OTHER_FAM_TAGS:
-           out_data[tag].append( value )
-
-        elif tag in ['even','fact']:
-           # Broken out specially because its custom style must
-           # be handled before the below test for general event list.
-           handle_custom_event( tag, level1, out_data )
-
-        elif tag in FAM_EVENT_TAGS:
-           handle_event_tag( tag, level1, out_data )
+        handler = FAM_HANDLERS.get( tag )
+        if handler:
+           handler( tag, level1, out_data )
 
         if parsed:
            # Map this file record back to the parsed section just created
@@ -1616,100 +1788,125 @@ def parse_family( level0, out_data ):
 
 def setup_parsed_families( sect, psect, data ):
     """ Parse all families. """
+    families = data[psect]
     for i, level0 in enumerate( data[sect] ):
         fam = extract_fam_id( level0['tag'] )
-        data[psect][fam] = dict()
-        data[psect][fam]['xref'] = int( fam.replace('F','').replace('f','') )
-        add_file_back_ref( sect, i, data[psect][fam] )
+        fam_data = dict()
+        fam_data['xref'] = int( fam.replace('f','') )
+        add_file_back_ref( sect, i, fam_data )
+
+        parse_family( level0, fam_data )
+
+        families[fam] = fam_data
+
+
+def handle_birth_info( tag, level1_data, out_data, relation_data ):
+    """ Parse the family relation given inside a birth or adoption event. """
+
+    # GEDCOM v5.5.1 pg 34
+    # GEDCOM v7.0.10 pg 51
+    tag_name = tag
+    if tag == 'adop':
+       tag_name = 'adopted'
+    elif tag == 'birt':
+       tag_name = 'birth'
+    elif tag == 'chr':
+       tag_name = 'chistened'
+
+    for level2 in level1_data['sub']:
+        if level2['tag'] == 'famc':
+           fam_id = extract_fam_id( level2['value'] )
+
+           # ok to add this again, duplicates will be cleaned up
+           out_data.setdefault( 'famc', [] ).append( fam_id )
+
+           parent = 'both'
+
+           if tag == 'adop':
+              if 'sub' in level2:
+                  for level3 in level2['sub']:
+                      if level3['tag'] == 'adop':
+                         parent = level3['value'].lower().strip()
+
+           relation_data[fam_id] = {'value': tag_name, 'parent': parent }
+
+
+def handle_pedigree_tag( fam_id, level1_data, relation_data ):
+    """ Parse the pedigree of a child to family link. """
+
+    # Possible pedigree options, applies to both parents
+    # GEDCOM v5.5.1 pg 31
+    # GEDCOM v7.0.10 pg 39
+    for level2 in level1_data['sub']:
+        if level2['tag'] == 'pedi':
+           if level2['value']:
+              adop_value = level2['value'].lower().strip()
+              relation_data[fam_id] = {'value': adop_value, 'parent':'both' }
+
+
+def indi_sub_name( tag, level1, out_data, relation_data ):
+    """ Individual record handler: a name. """
+    handle_name_tag( tag, level1, out_data )
 
-        parse_family( level0, data[psect][fam] )
+
+def indi_sub_family( tag, level1, out_data, relation_data ):
+    """ Individual record handler: a family xref, as a partner or child. """
+    fam_id = extract_fam_id( level1['value'] )
+    out_data[tag].append( fam_id )
+
+    if tag == 'famc':
+       handle_pedigree_tag( fam_id, level1, relation_data )
+
+
+def indi_sub_custom( tag, level1, out_data, relation_data ):
+    """ Individual record handler: a custom event. """
+    handle_custom_event( tag, level1, out_data )
+
+
+def indi_sub_value( tag, level1, out_data, relation_data ):
+    """ Individual record handler: the value as-is. """
+    out_data[tag].append( level1['value'] )
+
+
+def indi_sub_event( tag, level1, out_data, relation_data ):
+    """ Individual record handler: an event. """
+    handle_event_tag( tag, level1, out_data )
+
+    if tag in ('adop','birt','chr'):
+       handle_birth_info( tag, level1, out_data, relation_data )
+
+
+# Handlers for the level 1 records of an individual, by tag. Others are not parsed.
+# Filled from the lowest precedence up because a few tags are in more than
+# one list, i.e. the family xrefs are also in the other list and the custom
+# events are also in the event list.
+INDI_HANDLERS = dict.fromkeys( INDI_EVENT_TAGS, indi_sub_event )
+INDI_HANDLERS.update( dict.fromkeys( OTHER_INDI_TAGS, indi_sub_value ) )
+INDI_HANDLERS.update( dict.fromkeys( ['even','fact'], indi_sub_custom ) )
+INDI_HANDLERS.update( dict.fromkeys( ['fams','famc'], indi_sub_family ) )
+INDI_HANDLERS['name'] = indi_sub_name
 
 
 def parse_individual( level0, out_data, relation_data ):
     """ Parse an individual record from the input section to the parsed individuals section."""
 
-    def handle_birth_info( tag, level1_data ):
-        # GEDCOM v5.5.1 pg 34
-        # GEDCOM v7.0.10 pg 51
-        tag_name = tag
-        if tag == 'adop':
-           tag_name = 'adopted'
-        elif tag == 'birt':
-           tag_name = 'birth'
-        elif tag == 'chr':
-           tag_name = 'chistened'
-
-        for level2 in level1_data['sub']:
-            if level2['tag'] == 'famc':
-               fam_id = extract_fam_id( level2['value'] )
-
-               # ok to add this again, duplicates will be cleaned up
-               if 'famc' not in out_data:
-                  out_data['famc'] = []
-               out_data['famc'].append( fam_id )
-
-               parent = 'both'
-
-               if tag == 'adop':
-                  if 'sub' in level2:
-                      for level3 in level2['sub']:
-                          if level3['tag'] == 'adop':
-                             parent = level3['value'].lower().strip()
-
-               relation_data[fam_id] = {'value': tag_name, 'parent': parent }
-
-    def handle_pedigree_tag( level1_data ):
-        # Possible pedigree options, applies to both parents
-        # GEDCOM v5.5.1 pg 31
-        # GEDCOM v7.0.10 pg 39
-        for level2 in level1_data['sub']:
-            if level2['tag'] == 'pedi':
-               if level2['value']:
-                  adop_value = level2['value'].lower().strip()
-                  relation_data[fam_id] = {'value': adop_value, 'parent':'both' }
-
     # Use this flag on output of modified data
     out_data[PRIVATIZE_FLAG] = PRIVATIZE_OFF
 
     for level1 in level0['sub']:
         tag = level1['tag']
-        value = level1['value']
 
         # Not everything is copied to the parsed section.
         # Setup an empty list for those things which will be copied.
-        parsed = False
-        if tag == 'name' or tag in OTHER_INDI_TAGS + INDI_EVENT_TAGS:
-           parsed = True
-           if tag not in out_data:
-              out_data[tag] = []
+        parsed = tag in PARSED_INDI_TAG_SET
+        if parsed:
+           out_data.setdefault( tag, [] )
 
         # Now deal with that record.
 
-        if tag == 'name':
-           handle_name_tag( tag, level1, out_data )
-
-        elif tag in ['fams', 'famc']:
-           # These two broken out specially because they use the id extraction
-           # must be handled before the test for other-indi-tags.
-           fam_id = extract_fam_id( value )
-           out_data[tag].append( fam_id )
-
-           if tag == 'famc':
-              handle_pedigree_tag( level1 )
-
-        elif tag in ['even','fact']:
-           # This one broken out specially because its a custom event
-           # must be handled before the below test for regular events.
-           handle_custom_event( tag, level1, out_data )
-
-        elif tag in OTHER_INDI_TAGS:
-           out_data[tag].append( value )
-
-        elif tag in INDI_EVENT_TAGS:
-           handle_event_tag( tag, level1, out_data )
-
-           if tag in ['adop','birt','chr']:
-              handle_birth_info( tag, level1 )
+        handler = INDI_HANDLERS.get( tag )
+        if handler:
+           handler( tag, level1, out_data, relation_data )
 
         if parsed:
            that_index = len(out_data[tag]) - 1
@@ -1727,12 +1924,11 @@ def parse_individual( level0, out_data, relation_data ):
        out_data[tag].append( names )
 
     # due to family relation tags double xrefs might have been created
-    # so duplicates should be removed
-    for tag in ['famc','fams']:
-        for prefix in ['','birth-','all-']:
-            test_tag = prefix + tag
-            if test_tag in out_data and len(out_data[test_tag]) > 1:
-               out_data[test_tag] = list( set( out_data[test_tag] ) )
+    # so duplicates should be removed, keeping the first of each in file order
+    for test_tag in FAMILY_XREF_TAGS:
+        xrefs = out_data.get( test_tag )
+        if xrefs and len( xrefs ) > 1:
+           out_data[test_tag] = list( dict.fromkeys( xrefs ) )
 
     ensure_not_twice( ONCE_INDI_TAGS, 'Individual', level0['tag'], out_data )
     set_best_events( INDI_SINGLE_EVENTS, out_data )
@@ -1768,15 +1964,18 @@ def parse_place( level0, out_data ):
 
 def setup_parsed_individuals( sect, psect, data, relationships ):
     """ Parse all individuals. """
+    individuals = data[psect]
     for i, level0 in enumerate( data[sect] ):
         indi = extract_indi_id( level0['tag'] )
-        data[psect][indi] = dict()
-        data[psect][indi]['xref'] = int( indi.replace('I','').replace('i','') )
-        add_file_back_ref( sect, i, data[psect][indi] )
+        indi_data = dict()
+        indi_data['xref'] = int( indi.replace('i','') )
+        add_file_back_ref( sect, i, indi_data )
 
         indi_relations = dict()
 
-        parse_individual( level0, data[psect][indi], indi_relations )
+        parse_individual( level0, indi_data, indi_relations )
+
+        individuals[indi] = indi_data
 
         if indi_relations:
            relationships[indi] = indi_relations
@@ -1846,86 +2045,83 @@ def setup_parsed_sections( data ):
 def check_parsed_sections( data ):
     """ Check xref existance from individuals to families and vise versa."""
 
+    # The lists are rebuilt with the missing xrefs filtered out
+    # rather than removing items from a list while looping over it.
+
     isect = PARSED_INDI
     fsect = PARSED_FAM
-
-    for indi in data[isect]:
-        for fam_type in ['fams','famc']:
-            if fam_type in data[isect][indi]:
-               for fam in data[isect][indi][fam_type]:
-                   if fam not in data[fsect]:
-                      data[isect][indi][fam_type].remove( fam )
+    indis = data[isect]
+    fams = data[fsect]
+    exit_on_missing_families = run_settings['exit-on-missing-families']
+    exit_on_missing_individuals = run_settings['exit-on-missing-individuals']
+
+    for indi, indi_rec in indis.items():
+        for fam_type in ('fams','famc'):
+            fam_list = indi_rec.get( fam_type )
+            if fam_list:
+               missing = [ fam for fam in fam_list if fam not in fams ]
+               if missing:
+                  fam_list[:] = [ fam for fam in fam_list if fam in fams ]
+                  for fam in missing:
                       message = concat_things( DATA_WARN, SECT_INDI, indi, 'lists', fam, 'in', fam_type, 'but not found.' )
-                      if run_settings['exit-on-missing-families']:
+                      if exit_on_missing_families:
                          raise ValueError( message )
                       print_warn( message + ' Removing xref.' )
 
-    for fam in data[fsect]:
-        for fam_type in ['husb','wife']:
-            if fam_type in data[fsect][fam]:
-               for indi in data[fsect][fam][fam_type]:
-                   if indi and indi not in data[isect]:
-                      data[fsect][fam][fam_type].remove( indi )
+    for fam, fam_rec in fams.items():
+        for fam_type in ('husb','wife'):
+            indi_list = fam_rec.get( fam_type )
+            if indi_list:
+               missing = [ indi for indi in indi_list if indi and indi not in indis ]
+               if missing:
+                  indi_list[:] = [ indi for indi in indi_list if not indi or indi in indis ]
+                  for indi in missing:
                       message = concat_things( DATA_WARN, SECT_FAM, fam, 'lists', fam_type, 'of', indi, 'but not found.' )
-                      if run_settings['exit-on-missing-individuals']:
+                      if exit_on_missing_individuals:
                          raise ValueError( message )
                       print_warn( message + ' Removing xref.' )
 
         fam_type = 'chil'
-        if fam_type in data[fsect][fam]:
-           for indi in data[fsect][fam][fam_type]:
-               if indi not in data[isect]:
-                  data[fsect][fam][fam_type].remove( indi )
+        indi_list = fam_rec.get( fam_type )
+        if indi_list:
+           missing = [ indi for indi in indi_list if indi not in indis ]
+           if missing:
+              indi_list[:] = [ indi for indi in indi_list if indi in indis ]
+              for indi in missing:
                   message = concat_things( DATA_WARN, SECT_FAM, fam, 'lists', fam_type, 'of', indi, 'but not found.' )
-                  if run_settings['exit-on-missing-families']:
+                  if exit_on_missing_families:
                      raise ValueError( message )
                   print_warn( message + ' Removing xref.' )
 
 
-def ensure_int_values( the_list ):
-    """ Part of the self consistency checks."""
-    message = ''
+def non_int_values( the_list ):
+    """ Part of the self consistency checks. Yield each key/value whose value is not an int."""
     if isinstance(the_list,dict):
-       comma = ' '
-       for key in the_list:
-           value = the_list[key]
+       for key, value in the_list.items():
            if not isinstance(value,int):
-              message += comma + str(key) + '/' + str(value)
-              comma = ', '
-    return message
+              yield str(key) + '/' + str(value)
 
 
-def ensure_lowercase_values( the_list ):
-    """ Part of the self consistency checks."""
-    message = ''
+def uppercase_values( the_list ):
+    """ Part of the self consistency checks. Yield each key/value whose value is not a lowercase string."""
     if isinstance(the_list,dict):
-       comma = ' '
-       for key in the_list:
-           value = the_list[key]
+       for key, value in the_list.items():
            if isinstance(value,str):
-              if re.search( r'[A-Z]', value ):
-                 message += comma + str(key) + '/' + str(value)
-                 comma = ', '
+              if value != value.lower():
+                 yield str(key) + '/' + str(value)
            else:
-              message += comma + '+not a string:' + str(key) + '/' + str(value)
-              comma = ', '
-    return message
+              yield '+not a string:' + str(key) + '/' + str(value)
 
 
-def ensure_lowercase_elements( the_list ):
-    """ Part of the self consistency checks."""
-    message = ''
+def uppercase_elements( the_list ):
+    """ Part of the self consistency checks. Yield each element which is not a lowercase string."""
     if isinstance(the_list,(dict,list)):
-       comma = ' '
        for item in the_list:
            if isinstance(item,str):
-              if re.search( r'[A-Z]', item ):
-                 message += comma + item
-                 comma = ', '
+              if item != item.lower():
+                 yield item
            else:
-              message += comma + 'not s string:' + str(item)
-              comma = ', '
-    return message
+              yield 'not s string:' + str(item)
 
 
 def ensure_lowercase_constants():
@@ -1933,36 +2129,22 @@ def ensure_lowercase_constants():
     code = SELF_CONSISTENCY_ERR
 
     # Because tags, dates, etc. are converted to lowercase when parsing.
-    message = ''
-    message += ensure_lowercase_elements( SECTION_NAMES )
-    message += ensure_lowercase_elements( FAM_EVENT_TAGS )
-    message += ensure_lowercase_elements( INDI_EVENT_TAGS )
-    message += ensure_lowercase_elements( LEVEL2_NAMES )
-    message += ensure_lowercase_elements( DATE_MODIFIERS )
-    message += ensure_lowercase_elements( MONTH_NUMBERS )
-    message += ensure_lowercase_elements( MONTH_NAMES )
-    message += ensure_lowercase_elements( CALENDAR_NAMES )
-    message += ensure_lowercase_elements( ALT_DATE_MODIFIERS )
-    message += ensure_lowercase_elements( OTHER_INDI_TAGS )
-    message += ensure_lowercase_elements( FAM_MEMBER_TAGS )
-    message += ensure_lowercase_elements( OTHER_FAM_TAGS )
-    message += ensure_lowercase_elements( ONCE_INDI_TAGS )
-    message += ensure_lowercase_elements( ONCE_FAM_TAGS )
-    message += ensure_lowercase_elements( EVENT_PROOF_VALUES )
-    message += ensure_lowercase_elements( [ EVENT_PRIMARY_TAG, EVENT_PRIMARY_VALUE, EVENT_PROOF_TAG ] )
-    if message:
-       raise ValueError( code + 'Uppercase in constant, should be all lower:' + message )
-
-    message = ''
-    message += ensure_lowercase_values( ALT_DATE_MODIFIERS )
-    if message:
-       raise ValueError( code +'Non-string-number' + message )
-
-    message = ''
-    message += ensure_int_values( MONTH_NUMBERS )
-    message += ensure_int_values( EVENT_PROOF_VALUES )
-    if message:
-       raise ValueError( code + 'Non-number' + message )
+    lowercase_lists = [ SECTION_NAMES, FAM_EVENT_TAGS, INDI_EVENT_TAGS, LEVEL2_NAMES,
+                        DATE_MODIFIERS, MONTH_NUMBERS, MONTH_NAMES, CALENDAR_NAMES,
+                        ALT_DATE_MODIFIERS, OTHER_INDI_TAGS, FAM_MEMBER_TAGS, OTHER_FAM_TAGS,
+                        ONCE_INDI_TAGS, ONCE_FAM_TAGS, EVENT_PROOF_VALUES,
+                        [ EVENT_PRIMARY_TAG, EVENT_PRIMARY_VALUE, EVENT_PROOF_TAG ] ]
+    mistakes = [ item for the_list in lowercase_lists for item in uppercase_elements( the_list ) ]
+    if mistakes:
+       raise ValueError( code + 'Uppercase in constant, should be all lower: ' + ', '.join( mistakes ) )
+
+    mistakes = list( uppercase_values( ALT_DATE_MODIFIERS ) )
+    if mistakes:
+       raise ValueError( code + 'Non-string-number ' + ', '.join( mistakes ) )
+
+    mistakes = [ item for the_list in [ MONTH_NUMBERS, EVENT_PROOF_VALUES ] for item in non_int_values( the_list ) ]
+    if mistakes:
+       raise ValueError( code + 'Non-number ' + ', '.join( mistakes ) )
 
     if len(MONTH_NAMES) != 13:
        raise ValueError( code + 'MONTH_NAMES should have 13 elements' )
@@ -1988,33 +2170,29 @@ def compute_privatize_flag( death_limit, birth_limit, data ):
     # Default to complete privatization for everyone.
     result = PRIVATIZE_MAX
 
-    deceased_keys = ['deat','buri','crem']
-    birth_keys = ['birt','bapm','chr']
+    deceased_keys = ('deat','buri','crem')
+    birth_keys = ('birt','bapm','chr')
 
     tested_date = False
 
-    for key in deceased_keys:
-        if key in data:
-           if 'date' in data[key][0]:
-              if 'flagged' in data[key][0]['date']:
-                 # since the person has died, the setting gets relaxed
-                 result = PRIVATIZE_MIN
-                 break
+    best_events = data[BEST_EVENT_KEY]
 
-    # Do the full test again because the burial might be flagged,
-    # but the death date might be complete
+    # Any death type event, even only flagged, means the person has died
+    # so the setting gets relaxed. Keep checking the dates because the burial
+    # might be flagged, but the death date might be complete.
 
     for key in deceased_keys:
-        if key in data:
+        events = data.get( key )
+        if events:
            # relax the setting, keep checking the date
            result = PRIVATIZE_MIN
-           best_event = data[BEST_EVENT_KEY].get( key, 0 )
-           if 'date' in data[key][best_event]:
-              if data[key][best_event]['date']['is_known']:
+           date = events[best_events.get( key, 0 )].get( 'date' )
+           if date:
+              if date['is_known']:
                  tested_date = True
                  # compare with the "max" as the most recent date
                  # less-than means earlier than
-                 if data[key][best_event]['date']['max']['value'] <= death_limit:
+                 if date['max']['value'] <= death_limit:
                     # long ago, don't privatize anything
                     result = PRIVATIZE_OFF
                  break
@@ -2026,11 +2204,12 @@ def compute_privatize_flag( death_limit, birth_limit, data ):
        # Don't use a "flagged" test - that doesn't tell an age
 
        for key in birth_keys:
-           if key in data:
-              best_event = data[BEST_EVENT_KEY].get( key, 0 )
-              if 'date' in data[key][best_event]:
-                 if data[key][best_event]['date']['is_known']:
-                    if data[key][best_event]['date']['max']['value'] <= birth_limit:
+           events = data.get( key )
+           if events:
+              date = events[best_events.get( key, 0 )].get( 'date' )
+              if date:
+                 if date['is_known']:
+                    if date['max']['value'] <= birth_limit:
                        result = PRIVATIZE_OFF
                     break
 
@@ -2096,20 +2275,23 @@ def set_privatize_flag( data, years_since_death=20, max_lifetime=104 ):
     compare_with_death = comparable_before_today( years_since_death )
     compare_with_birth = comparable_before_today( years_since_death + max_lifetime )
 
-    for indi in data[PARSED_INDI]:
-        data[PARSED_INDI][indi][PRIVATIZE_FLAG] = compute_privatize_flag( compare_with_death, compare_with_birth, data[PARSED_INDI][indi] )
+    # Keep the flags in a flat dict for the family lookups below.
+    indi_flags = dict()
+
+    for indi, indi_rec in data[PARSED_INDI].items():
+        flag = compute_privatize_flag( compare_with_death, compare_with_birth, indi_rec )
+        indi_rec[PRIVATIZE_FLAG] = flag
+        indi_flags[indi] = flag
 
     # If an individual is flagged, then the families in which they are a parent
     # must also be flagged to the highest level of the parents.
 
-    for fam in data[PARSED_FAM]:
-        # Start at off, then find the highest of both partners
-        value = PRIVATIZE_OFF
-        for partner in [ 'husb', 'wife' ]:
-            if partner in data[PARSED_FAM][fam]:
-               for indi in data[PARSED_FAM][fam][partner]:
-                   value = max( value, data[PARSED_INDI][indi][PRIVATIZE_FLAG] )
-        data[PARSED_FAM][fam][PRIVATIZE_FLAG] = value
+    for fam_rec in data[PARSED_FAM].values():
+        # The highest of both partners, off if there are none
+        fam_rec[PRIVATIZE_FLAG] = max( ( indi_flags.get( indi, PRIVATIZE_OFF )
+                                         for partner in ( 'husb', 'wife' )
+                                         for indi in fam_rec.get( partner ) or () ),
+                                       default=PRIVATIZE_OFF )
 
 
 def read_in_data( inf, data ):
@@ -2122,19 +2304,19 @@ def read_in_data( inf, data ):
 
     global version
 
-    # The tag at the most recent level 0 and level 1, etc.
+    # The section of the most recent level 0 record.
     sect = '?'
-    zero = None
-    one = None
-    two = None
-    three = None
-    four = None
+
+    # The sub-record lists of the most recent record at level 0, level 1, etc.
+    # A record at level n is appended to the list at index n-1.
+    # The next deeper entry is cleared when a new record starts a level.
+    parents = [None] * 5
 
     # Watch for the last record in the file.
     final_section = '?'
 
     ignore_line = False
-    lines_found = []
+    lines_found = set()
 
     n_line = 0
 
@@ -2149,48 +2331,69 @@ def read_in_data( inf, data ):
         line = line.replace( '\t', ' ' ).strip()
 
         if line:
-           if line.startswith( '0 ' ):
+           # the level number and its following space
+           level = line[:2]
+
+           # ordered by how often the levels occur, most sub-records are levels 1 and 2
+           if level == '1 ':
+              if not ignore_line:
+                 record = line_values( line )
+                 parents[0].append( record )
+                 parents[1] = record['sub']
+                 parents[2] = None
+
+              # check the character set as soon as its found
+              if sect == SECT_HEAD:
+                 lc_line = line.lower()
+                 if lc_line.startswith( '1 char' ):
+                    if lc_line not in ['1 char utf-8','1 char ascii']:
+                       print_warn( 'Unusable character set: ' + line )
+                       # quit right away
+                       raise ValueError( 'Unusable character set' )
+
+           elif level == '2 ':
+              if not ignore_line:
+                 record = line_values( line )
+                 parents[1].append( record )
+                 parents[2] = record['sub']
+                 parents[3] = None
+
+           elif level == '0 ':
               lc_line = line.lower()
               ignore_line = False
 
+              # the record type is usually the last word, ex: "0 @i12@ indi"
+              lc_start, _, lc_last_word = lc_line.rpartition( ' ' )
+
               if lc_line.startswith( '0 head' ):
                  sect = SECT_HEAD
 
-              elif lc_line.startswith( '0 @i' ) and lc_line.endswith( ' indi' ):
+              elif lc_last_word == SECT_INDI and lc_line.startswith( '0 @i' ):
                  sect = SECT_INDI
                  if lc_line in lines_found:
                     ignore_line = True
                     print_warn( concat_things( DATA_WARN, 'Duplicate section ignored:', line ) )
-                 lines_found.append( lc_line )
+                 lines_found.add( lc_line )
 
               elif lc_line.startswith( '0 ' + SECT_PLAC ) or lc_line.startswith( '0 PLAC ' ):
                  sect = SECT_PLAC
                  if lc_line in lines_found:
                     ignore_line = True
                     print_warn( concat_things( DATA_WARN, 'Duplicate place being ignored:', line ) )
-                 lines_found.append( lc_line )
+                 lines_found.add( lc_line )
 
-              elif lc_line.startswith( '0 @f' ) and lc_line.endswith( ' fam' ):
+              elif lc_last_word == SECT_FAM and lc_line.startswith( '0 @f' ):
                  sect = SECT_FAM
                  if lc_line in lines_found:
                     ignore_line = True
                     print_warn( concat_things( DATA_WARN, 'Duplicate section ignored:', line ) )
-                 lines_found.append( lc_line )
+                 lines_found.add( lc_line )
 
               elif lc_line.startswith( '0 trlr' ):
                  sect = SECT_TRLR
 
-              elif lc_line.endswith( '@ obje' ):
-                 sect = 'obje'
-
-              elif lc_line.endswith( '@ repo' ):
-                 sect = 'repo'
-
-              elif lc_line.endswith( '@ sour' ):
-                 sect = 'sour'
-
-              elif lc_line.endswith( '@ subm' ):
-                 sect = 'subm'
+              elif lc_last_word in XREF_SECTION_NAMES and lc_start.endswith( '@' ):
+                 sect = lc_last_word
 
               elif '@ snote' in lc_line:
                  sect = 'snote'
@@ -2215,47 +2418,29 @@ def read_in_data( inf, data ):
                     version = confirm_gedcom_version( data )
 
               if not ignore_line:
-                 data[sect].append( line_values( line ) )
-                 zero = len( data[sect] ) - 1
-                 one = None
+                 record = line_values( line )
+                 data[sect].append( record )
+                 parents[0] = record['sub']
+                 parents[1] = None
 
               final_section = sect
 
-           elif line.startswith( '1 ' ):
+           elif level == '3 ':
               if not ignore_line:
-                 data[sect][zero]['sub'].append( line_values( line ) )
-                 one = len( data[sect][zero]['sub'] ) - 1
-                 two = None
+                 record = line_values( line )
+                 parents[2].append( record )
+                 parents[3] = record['sub']
+                 parents[4] = None
 
-              # check the character set as soon as its found
-              if sect == SECT_HEAD:
-                 if lc_line.startswith( '1 char' ):
-                    if lc_line not in ['1 char utf-8','1 char ascii']:
-                       print_warn( 'Unusable character set: ' + line )
-                       # quit right away
-                       raise ValueError( 'Unusable character set' )
-
-
-           elif line.startswith( '2 ' ):
+           elif level == '4 ':
               if not ignore_line:
-                 data[sect][zero]['sub'][one]['sub'].append( line_values( line ) )
-                 two = len( data[sect][zero]['sub'][one]['sub'] ) - 1
-                 three = None
+                 record = line_values( line )
+                 parents[3].append( record )
+                 parents[4] = record['sub']
 
-           elif line.startswith( '3 ' ):
+           elif level == '5 ':
               if not ignore_line:
-                 data[sect][zero]['sub'][one]['sub'][two]['sub'].append( line_values( line ) )
-                 three = len( data[sect][zero]['sub'][one]['sub'][two]['sub'] ) - 1
-                 four = None
-
-           elif line.startswith( '4 ' ):
-              if not ignore_line:
-                 data[sect][zero]['sub'][one]['sub'][two]['sub'][three]['sub'].append( line_values( line ) )
-                 four = len( data[sect][zero]['sub'][one]['sub'][two]['sub'][three]['sub'] ) - 1
-
-           elif line.startswith( '5 ' ):
-              if not ignore_line:
-                 data[sect][zero]['sub'][one]['sub'][two]['sub'][three]['sub'][four]['sub'].append( line_values( line ) )
+                 parents[4].append( line_values( line ) )
                  # unlikely to be a level 6
 
            else:
@@ -2298,54 +2483,46 @@ def setup_birth_families( only_birth, individuals, families ):
     # No matter which setting, the full list gets stored.
     # Perform a simple deep copy, because the reference lists might change later
     # At the same time, setup for birth only lists.
-
-    famc = 'famc'
-    all_tag = 'all-' + famc
-    birth_indi_tag = 'birth-' + famc
-    for indi in individuals:
-        if famc in individuals[indi]:
-           individuals[indi][birth_indi_tag] = []
-           individuals[indi][all_tag] = []
-           for fam in individuals[indi][famc]:
-               individuals[indi][all_tag].append( fam )
+    # The families go first so that their birth lists exist
+    # when the individuals are added to them.
 
     chil = 'chil'
-    all_tag = 'all-' + chil
+    all_fam_tag = 'all-' + chil
     birth_fam_tag = 'birth-' + chil
-    for fam in families:
-        if chil in families[fam]:
-           families[fam][birth_fam_tag] = []
-           families[fam][all_tag] = []
-           for indi in families[fam][chil]:
-               families[fam][all_tag].append( indi )
+    for fam_data in families.values():
+        if chil in fam_data:
+           fam_data[birth_fam_tag] = []
+           fam_data[all_fam_tag] = list( fam_data[chil] )
 
     # Is it possible to have a list of birth families.
     # Maybe if research is inconclusive, so make it list.
     # Similar setup for the families.
 
-    for indi in individuals:
-        if famc in individuals[indi]:
-           for fam in individuals[indi][famc]:
-               if fam in families:
-                  if is_birth_family( indi, families[fam] ):
-                     if fam not in individuals[indi][birth_indi_tag]:
-                        individuals[indi][birth_indi_tag].append( fam )
-                     if indi not in families[fam][birth_fam_tag]:
-                        families[fam][birth_fam_tag].append( indi )
+    famc = 'famc'
+    all_indi_tag = 'all-' + famc
+    birth_indi_tag = 'birth-' + famc
+    for indi, indi_data in individuals.items():
+        if famc in indi_data:
+           fam_list = indi_data[famc]
+           birth_fams = []
+           for fam in fam_list:
+               fam_data = families.get( fam )
+               if fam_data is not None and is_birth_family( indi, fam_data ):
+                  if fam not in birth_fams:
+                     birth_fams.append( fam )
+                  birth_children = fam_data[birth_fam_tag]
+                  if indi not in birth_children:
+                     birth_children.append( indi )
+           indi_data[birth_indi_tag] = birth_fams
+           indi_data[all_indi_tag] = list( fam_list )
+           if only_birth:
+              # Change the contents of the list, simple deep copy
+              indi_data[famc] = list( birth_fams )
 
     if only_birth:
-       # Change the contents of the lists
-       # Simple deep copy
-       for indi in individuals:
-           if famc in individuals[indi]:
-              individuals[indi][famc] = []
-              for fam in individuals[indi][birth_indi_tag]:
-                  individuals[indi][famc].append( fam )
-       for fam in families:
-           if chil in families[fam]:
-              families[fam][chil] = []
-              for indi in families[fam][birth_fam_tag]:
-                  families[fam][chil].append( indi )
+       for fam_data in families.values():
+           if chil in fam_data:
+              fam_data[chil] = list( fam_data[birth_fam_tag] )
 
 
 def read_file( datafile, given_settings=None ):
@@ -2362,8 +2539,11 @@ def read_file( datafile, given_settings=None ):
     """
     global run_settings
     global unicode_table
+    global unicode_translation
+    global unicode_sequences
     global min_valid_year
     global max_valid_year
+    global constants_checked
 
     assert isinstance( datafile, str ), 'Non-string passed as the filename.'
 
@@ -2379,7 +2559,7 @@ def read_file( datafile, given_settings=None ):
     # Also file i/o errors which will throw system exceptions.
     data[PARSED_MESSAGES] = []
 
-    if SELF_CONSISTENCY_CHECKS:
+    if SELF_CONSISTENCY_CHECKS and not constants_checked:
        # Ensure no conflict between the section names.
        for sect in SECTION_NAMES:
            for parsed_sect in [PARSED_INDI, PARSED_FAM]:
@@ -2388,8 +2568,12 @@ def read_file( datafile, given_settings=None ):
        if PARSED_INDI == PARSED_FAM:
           raise ValueError( SELF_CONSISTENCY_ERR + 'section name duplication:' + str(PARSED_INDI) )
        ensure_lowercase_constants()
+       constants_checked = True
 
     unicode_table = setup_unicode_table()
+    unicode_translation = str.maketrans( { item[0]: item[1] for item in unicode_table.values() if len(item[0]) == 1 } )
+    unicode_sequences = [ item for item in unicode_table.values() if len(item[0]) > 1 ]
+    convert_to_unicode.cache_clear()
 
     # These are the zero level tags expected in the file.
     # Some may not occur.
@@ -2405,7 +2589,7 @@ def read_file( datafile, given_settings=None ):
        min_valid_year = 0
        max_valid_year = 9999
 
-    with open( datafile, encoding='utf-8' ) as inf:
+    with open( datafile, encoding='utf-8', buffering=READ_BUFFER_SIZE ) as inf:
          read_in_data( inf, data )
 
     if len( data[SECT_HEAD] ) != 1:
@@ -2447,18 +2631,24 @@ def report_double_facts( data, is_indi, check_list ):
     """ Print events or other records which occur more than once."""
     assert isinstance( check_list, list ), 'Non-list passed as check_list parameter'
 
-    for owner in data.keys():
+    # the same tags are checked for everyone, clean them up once
+    check_tags = []
+    for item in check_list:
+        if isinstance( item, str ):
+           item = item.lower()
+           if item != 'even':
+              check_tags.append( item )
+
+    for owner, owner_data in data.items():
         name = owner
         if is_indi:
-           if 'name' in data[owner]:
-              name += ' / ' + data[owner]['name'][0]['display']
-        for item in check_list:
-            if isinstance( item, str ):
-               item = item.lower()
-               if item != 'even' and item in data[owner]:
-                  n = len( data[owner][item] )
-                  if n > 1:
-                     print( name, 'has', n, item )
+           if 'name' in owner_data:
+              name += ' / ' + owner_data['name'][0]['display']
+        for item in check_tags:
+            if item in owner_data:
+               n = len( owner_data[item] )
+               if n > 1:
+                  print( name, 'has', n, item )
 
 
 def report_individual_double_facts( data, check_list=None ):
@@ -2511,29 +2701,26 @@ def report_family_double_facts( data, check_list=None ):
     report_double_facts( data[PARSED_FAM], False, check_list )
 
 
+# The search operations, called as operation( have, want ).
+# These are for string objects.
+STRING_COMPARISONS = { '=': operator.eq, '!=': operator.ne,
+                       '<': operator.lt, '<=': operator.le, '=<': operator.le,
+                       '>': operator.gt, '>=': operator.ge, '=>': operator.ge,
+                       'in': operator.contains,
+                       '!in': lambda have, want: want not in have }
+
+# For the integer dates "in" is the same as equal.
+INT_COMPARISONS = dict( STRING_COMPARISONS, **{ 'in': operator.eq, '!in': operator.ne } )
+
+
 def match_individual( indi_data, tag, subtag, search_value, operation, only_best ):
     """ Return True if individual's data matches the search condition. """
 
     def compare( have, want, op ):
-        # these are for string objects
-        result = False
-        if op == '=':
-           result = have == want
-        elif op == '!=':
-           result = have != want
-        elif op == '<':
-           result = have < want
-        elif op in ['<=','=<']:
-           result = have <= want
-        elif op == '>':
-           result = have > want
-        elif op in ['>=','=>']:
-           result = have >= want
-        elif op == 'in':
-           result = want in have
-        elif op == '!in':
-           result = want not in have
-        return result
+        comparison = STRING_COMPARISONS.get( op )
+        if comparison:
+           return comparison( have, want )
+        return False
 
     def find_best( tag ):
         return indi_data[BEST_EVENT_KEY].get( tag, 0 )
@@ -2645,17 +2832,18 @@ def get_indi_display( indi_data ):
 
         full_result = ''
         year_result = ''
-        best = indi_data[BEST_EVENT_KEY].get( tag, 0 )
         if tag in indi_data:
-           if 'date' in indi_data[tag][best]:
-              if indi_data[tag][best]['date']['is_known']:
-                 modifier = indi_data[tag][best]['date']['min']['modifier']
-                 value = indi_data[tag][best]['date']['min']['value']
+           best = indi_data[BEST_EVENT_KEY].get( tag, 0 )
+           date = indi_data[tag][best].get( 'date' )
+           if date:
+              if date['is_known']:
+                 modifier = date['min']['modifier']
+                 value = date['min']['value']
                  full_result = modifier + ' ' + yyyymmdd_to_date( value )
                  year_result = modifier + ' ' + value[0:4]
-                 if indi_data[tag][best]['date']['is_range']:
-                    modifier = indi_data[tag][best]['date']['max']['modifier']
-                    value = indi_data[tag][best]['date']['max']['value']
+                 if date['is_range']:
+                    modifier = date['max']['modifier']
+                    value = date['max']['value']
                     full_result += ' ' + modifier + ' ' + yyyymmdd_to_date( value )
         return [ cleanup(full_result), cleanup(year_result) ]
 
@@ -2719,20 +2907,10 @@ def find_individuals( data, search_tag, search_value, operation='=', only_best=T
     """
 
     def compare_int( have, want, op ):
-        result = False
-        if op in ['=','in']:
-           result = have == want
-        elif op in ['!=','!in']:
-           result = have != want
-        elif op == '<':
-           result = have < want
-        elif op in ['<=','=<']:
-           result = have <= want
-        elif op == '>':
-           result = have > want
-        elif op in ['>=','=>']:
-           result = have >= want
-        return result
+        comparison = INT_COMPARISONS.get( op )
+        if comparison:
+           return comparison( have, want )
+        return False
 
     def existance_match( individual, tag, subtag ):
         result = False
@@ -3130,13 +3308,16 @@ def report_counts( data ):
                             add_event_dates( tag, section[tag][0]['date'] )
 
 
+    indi_tags = INDI_EVENT_TAGS + OTHER_INDI_TAGS
+    fam_tags = FAM_EVENT_TAGS + OTHER_FAM_TAGS
+
     def count_indi_events( person_data, counts ):
-        count_events( person_data, INDI_EVENT_TAGS + OTHER_INDI_TAGS, counts )
+        count_events( person_data, indi_tags, counts )
         if 'name' in person_data and len( person_data['name'] ) > 1:
            counts['alt-names'] += 1
 
     def count_fam_events( fam_data, counts ):
-        count_events( fam_data, FAM_EVENT_TAGS + OTHER_FAM_TAGS, counts )
+        count_events( fam_data, fam_tags, counts )
         if 'chil' in fam_data and len( fam_data['chil'] ) > 0:
            counts['with-children'] += 1
 